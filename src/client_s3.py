@@ -1,16 +1,35 @@
+import functools
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import NoCredentialsError, ClientError
 from dotenv import load_dotenv
 
 from .logger import logger
 
-load_dotenv(override=True)
+_COUNTER_RE_CACHE: dict[str, re.Pattern] = {}
+
+
+def _counter_pattern(prefix: str) -> re.Pattern:
+    pattern = _COUNTER_RE_CACHE.get(prefix)
+    if pattern is None:
+        pattern = re.compile(rf"{re.escape(prefix)}_(\d+)")
+        _COUNTER_RE_CACHE[prefix] = pattern
+    return pattern
 
 
 class S3:
+    # Objects above the threshold are fetched with parallel ranged GETs.
+    RANGED_DOWNLOAD_THRESHOLD = 16 * 1024 * 1024
+    RANGED_DOWNLOAD_CHUNK = 8 * 1024 * 1024
+    RANGED_DOWNLOAD_WORKERS = 8
+
     def __init__(self, region: str, access_key: str, secret_key: str, bucket_name: str, endpoint_url: str):
         self.region: str = region
         self.access_key: str = access_key
@@ -18,9 +37,19 @@ class S3:
         self.bucket_name: str = bucket_name
         self.endpoint_url: str = endpoint_url
         self.s3_client = self.get_client()
+        self._client = self.s3_client.meta.client
+        self.validate_bucket()
         self.input_dir: str = os.getenv("S3_INPUT_DIR", "")
         self.output_dir: str = os.getenv("S3_OUTPUT_DIR", "")
         self.list_limit_items: int = int(os.getenv("LIST_LIMIT_ITEMS", 100))
+        self.listing_cache_ttl: float = float(os.getenv("S3_LISTING_CACHE_TTL", 30))
+        self.transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=16 * 1024 * 1024,
+            max_concurrency=int(os.getenv("S3_CONCURRENCY", 16)),
+            use_threads=True,
+        )
+        self._listing_cache: dict[str, tuple[float, list[str]]] = {}
         if self.input_dir and not self.does_folder_exist(self.input_dir):
             self.create_folder(self.input_dir)
         if self.output_dir and not self.does_folder_exist(self.output_dir):
@@ -35,7 +64,11 @@ class S3:
             if addressing_style not in ["auto", "virtual", "path"]:
                 logger.warning(f"Invalid S3_ADDRESSING_STYLE value: {addressing_style}, using 'auto' instead")
                 addressing_style = "auto"
-            s3_config = Config(s3={"addressing_style": addressing_style})  # S3 addressing_style: auto/virtual/path
+            s3_config = Config(
+                s3={"addressing_style": addressing_style},  # S3 addressing_style: auto/virtual/path
+                max_pool_connections=int(os.getenv("S3_POOL_CONNECTIONS", 64)),
+                retries={"max_attempts": 10, "mode": "adaptive"},
+            )
 
             s3 = boto3.resource(
                 service_name="s3",
@@ -50,31 +83,53 @@ class S3:
             err = f"Failed to create S3 client: {e}"
             logger.error(err)
 
-    def get_files(self, prefix: str) -> list[str]:
-        if self.does_folder_exist(prefix):
-            try:
-                bucket = self.s3_client.Bucket(self.bucket_name)
-                files = [obj.key for obj in bucket.objects.filter(Prefix=prefix).limit(self.list_limit_items)]
-                files = [f for f in files if not f.endswith("/")]
-                return files
-            except Exception as e:
-                err = f"Failed to get files from S3: {e}"
-                logger.error(err)
-        return []
+    def validate_bucket(self) -> None:
+        try:
+            self._client.head_bucket(Bucket=self.bucket_name)
+        except Exception as e:
+            err = f"Failed to access S3 bucket '{self.bucket_name}': {e}"
+            logger.error(err)
 
-    def does_folder_exist(self, folder_name: str) -> bool | None:
+    def _get_cached_listing(self, prefix: str, refresh: bool = False) -> list[str]:
+        # An empty prefix means the bucket root, not the literal key "/"
+        cache_key = prefix.rstrip("/") + "/" if prefix.rstrip("/") else ""
+        if not refresh:
+            cached = self._listing_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < self.listing_cache_ttl:
+                return cached[1]
         try:
-            bucket = self.s3_client.Bucket(self.bucket_name)
-            response = bucket.objects.filter(Prefix=folder_name)
-            return any(obj.key.startswith(folder_name) for obj in response)
+            response = self._client.list_objects_v2(
+                Bucket=self.bucket_name, Prefix=cache_key, MaxKeys=self.list_limit_items
+            )
+            keys = [obj["Key"] for obj in response.get("Contents", ())]
         except Exception as e:
-            err = f"Failed to check if folder exists in S3: {e}"
+            err = f"Failed to list objects in S3: {e}"
             logger.error(err)
+            return []
+        self._listing_cache[cache_key] = (time.monotonic(), keys)
+        return keys
+
+    def _invalidate_listing(self, s3_path: str) -> None:
+        prefix = s3_path.rstrip("/") + "/"
+        parent = os.path.dirname(s3_path.rstrip("/")).rstrip("/") + "/"
+        self._listing_cache.pop(prefix, None)
+        self._listing_cache.pop(parent, None)
+
+    def get_files(self, prefix: str, refresh: bool = False) -> list[str]:
+        keys = self._get_cached_listing(prefix, refresh=refresh)
+        return [f for f in keys if not f.endswith("/")]
+
+    def does_folder_exist(self, folder_name: str, refresh: bool = False) -> bool:
+        if not folder_name.rstrip("/"):
+            # The bucket root always exists; don't scan the whole bucket for it
+            return True
+        return bool(self._get_cached_listing(folder_name, refresh=refresh))
 
     def create_folder(self, folder_name: str) -> None:
         try:
             bucket = self.s3_client.Bucket(self.bucket_name)
             bucket.put_object(Key=f"{folder_name}/")
+            self._invalidate_listing(folder_name)
         except Exception as e:
             err = f"Failed to create folder in S3: {e}"
             logger.error(err)
@@ -85,7 +140,7 @@ class S3:
             os.makedirs(local_dir)
         try:
             bucket = self.s3_client.Bucket(self.bucket_name)
-            bucket.download_file(s3_path, local_path)
+            bucket.download_file(s3_path, local_path, Config=self.transfer_config)
             return local_path
         except NoCredentialsError:
             err = "Credentials not available or not valid."
@@ -94,21 +149,48 @@ class S3:
             err = f"Failed to download file from S3: {e}"
             logger.error(err)
 
-    def download_object(self, s3_path: str) -> bytes | None:
+    def _download_ranges(self, s3_path: str, size: int) -> bytes:
+        chunk = self.RANGED_DOWNLOAD_CHUNK
+        buffer = bytearray(size)
+
+        def fetch(offset: int) -> None:
+            end = min(offset + chunk, size) - 1
+            response = self._client.get_object(
+                Bucket=self.bucket_name, Key=s3_path, Range=f"bytes={offset}-{end}"
+            )
+            buffer[offset : end + 1] = response["Body"].read()
+
+        with ThreadPoolExecutor(max_workers=self.RANGED_DOWNLOAD_WORKERS) as executor:
+            list(executor.map(fetch, range(0, size, chunk)))
+        return bytes(buffer)
+
+    def download_to_fileobj(self, s3_path: str, fileobj) -> bool:
         try:
             bucket = self.s3_client.Bucket(self.bucket_name)
-            s3_object = bucket.Object(s3_path)
-            response = s3_object.get()
-            body = response.get("Body")
-            if body:
-                return body.read()
-            return None
+            bucket.download_fileobj(s3_path, fileobj, Config=self.transfer_config)
+            return True
+        except NoCredentialsError:
+            err = "Credentials not available or not valid."
+            logger.error(err)
+        except Exception as e:
+            err = f"Failed to download object from S3: {e}"
+            logger.error(err)
+        return False
+
+    def download_object(self, s3_path: str) -> bytes | None:
+        try:
+            head = self._client.head_object(Bucket=self.bucket_name, Key=s3_path)
+            size = head["ContentLength"]
+            if size > self.RANGED_DOWNLOAD_THRESHOLD:
+                return self._download_ranges(s3_path, size)
+            response = self._client.get_object(Bucket=self.bucket_name, Key=s3_path)
+            return response["Body"].read()
         except NoCredentialsError:
             err = "Credentials not available or not valid."
             logger.error(err)
             return None
         except ClientError as e:
-            if e.response["Error"]["Code"] == "NoSuchKey":
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
                 err = f"Object not found in S3: {s3_path}"
                 logger.error(err)
             else:
@@ -123,7 +205,8 @@ class S3:
     def upload_file(self, local_path: str, s3_path: str, move_file: bool = False):
         try:
             bucket = self.s3_client.Bucket(self.bucket_name)
-            bucket.upload_file(local_path, s3_path)
+            bucket.upload_file(local_path, s3_path, Config=self.transfer_config)
+            self._invalidate_listing(s3_path)
             if move_file:
                 os.remove(local_path)
             return s3_path
@@ -138,15 +221,6 @@ class S3:
         self, filename_prefix: str, image_width: int = 0, image_height: int = 0
     ) -> tuple[str, str, int, str, str]:
 
-        def map_filename(filename: str) -> tuple[int, str]:
-            prefix_len = len(os.path.basename(filename_prefix))
-            prefix = filename[: prefix_len + 1]
-            try:
-                digits = int(filename[prefix_len + 1 :].split("_")[0])
-            except Exception:
-                digits = 0
-            return digits, prefix
-
         def compute_vars(input_str: str, image_width: int, image_height: int) -> str:
             input_str = input_str.replace("%width%", str(image_width))
             input_str = input_str.replace("%height%", str(image_height))
@@ -158,29 +232,26 @@ class S3:
 
         full_output_folder_s3 = os.path.join(self.output_dir, subfolder)
 
-        # Check if the output folder exists, create it if it doesn't
-        if not self.does_folder_exist(full_output_folder_s3):
+        # One listing answers both the existence check and the counter scan
+        keys = self._get_cached_listing(full_output_folder_s3)
+        if not keys:
             self.create_folder(full_output_folder_s3)
 
-        try:
-            # Continue with the counter calculation
-            files = self.get_files(full_output_folder_s3)
-            counter = (
-                max(
-                    filter(
-                        lambda a: a[1][:-1] == filename and a[1][-1] == "_",
-                        map(map_filename, files),
-                    )
-                )[0]
-                + 1
-            )
-        except (ValueError, KeyError):
-            counter = 1
+        # Continue with the counter calculation: single pass over the listed keys
+        pattern = _counter_pattern(filename)
+        highest = 0
+        for key in keys:
+            match = pattern.match(os.path.basename(key))
+            if match:
+                highest = max(highest, int(match.group(1)))
+        counter = highest + 1
 
         return full_output_folder_s3, filename, counter, subfolder, filename_prefix
 
 
+@functools.cache
 def get_s3_instance():
+    load_dotenv(override=True)
     try:
         s3_instance = S3(
             region=os.getenv("S3_REGION"),
@@ -193,3 +264,8 @@ def get_s3_instance():
     except Exception as e:
         err = f"Failed to create S3 instance: {e} Please check your environment variables."
         logger.error(err)
+
+
+# Warm the singleton in the background so the first node call finds it ready
+# without blocking ComfyUI imports.
+threading.Thread(target=get_s3_instance, daemon=True, name="comfys3-warmup").start()
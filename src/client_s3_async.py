@@ -0,0 +1,56 @@
+import asyncio
+import os
+
+from botocore.config import Config
+from dotenv import load_dotenv
+
+from .logger import logger
+
+try:
+    from aiobotocore.session import get_session
+except ImportError:
+    get_session = None
+
+
+async def download_many(keys: list[str]) -> dict[str, bytes | None]:
+    if get_session is None:
+        err = "aiobotocore is not installed, run 'pip install aiobotocore' to enable async downloads."
+        logger.error(err)
+        raise ImportError(err)
+    load_dotenv(override=True)
+    bucket_name = os.getenv("S3_BUCKET_NAME")
+    addressing_style = os.getenv("S3_ADDRESSING_STYLE", "auto")
+    if addressing_style not in ["auto", "virtual", "path"]:
+        logger.warning(f"Invalid S3_ADDRESSING_STYLE value: {addressing_style}, using 'auto' instead")
+        addressing_style = "auto"
+    s3_config = Config(
+        s3={"addressing_style": addressing_style},  # S3 addressing_style: auto/virtual/path
+        max_pool_connections=int(os.getenv("S3_POOL_CONNECTIONS", 64)),
+        retries={"max_attempts": 10, "mode": "adaptive"},
+    )
+    session = get_session()
+    async with session.create_client(
+        service_name="s3",
+        region_name=os.getenv("S3_REGION"),
+        aws_access_key_id=os.getenv("S3_ACCESS_KEY"),
+        aws_secret_access_key=os.getenv("S3_SECRET_KEY"),
+        endpoint_url=os.getenv("S3_ENDPOINT_URL"),
+        config=s3_config,
+    ) as client:
+
+        async def fetch(key: str) -> tuple[str, bytes | None]:
+            try:
+                response = await client.get_object(Bucket=bucket_name, Key=key)
+                async with response["Body"] as body:
+                    return key, await body.read()
+            except Exception as e:
+                err = f"Failed to download object from S3: {e}"
+                logger.error(err)
+                return key, None
+
+        results = await asyncio.gather(*(fetch(key) for key in keys))
+    return dict(results)
+
+
+def download_many_sync(keys: list[str]) -> dict[str, bytes | None]:
+    return asyncio.run(download_many(keys))
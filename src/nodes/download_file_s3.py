@@ -1,5 +1,4 @@
 from ..client_s3 import get_s3_instance
-S3_INSTANCE = get_s3_instance()
 
 
 class DownloadFileS3:
@@ -20,6 +19,6 @@ class DownloadFileS3:
     FUNCTION = "download_file_s3"
     
     def download_file_s3(self, s3_path, local_path):
-        local_path = S3_INSTANCE.download_file(s3_path=s3_path, local_path=local_path)
+        local_path = get_s3_instance().download_file(s3_path=s3_path, local_path=local_path)
         print(f"Downloaded file from S3 to {local_path}")
         return (local_path,)
\ No newline at end of file
@@ -1,21 +1,82 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
-import numpy as np
 import torch
 from PIL import Image, ImageOps, ImageSequence
 
 from ..client_s3 import get_s3_instance
 from ..logger import logger
 
-S3_INSTANCE = get_s3_instance()
+try:
+    from torchvision.io import ImageReadMode, decode_image
+except ImportError:
+    decode_image = None
+
+# Lookup table mapping 16-bit "I" pixel values to 8-bit, applied in C by
+# Image.point instead of a per-pixel Python lambda.
+_I_TO_L_TABLE = [min(255, value // 255) for value in range(65536)]
+
+
+# Opt-in: page-locked output tensors halve the host-to-device copy time
+# when downstream nodes push them to CUDA. Resolved lazily so the .env
+# loaded by get_s3_instance is visible when the flag is read.
+_PIN_MEMORY: bool | None = None
+
+
+def _maybe_pin(image: torch.Tensor, mask: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+    global _PIN_MEMORY
+    if _PIN_MEMORY is None:
+        get_s3_instance()  # makes sure the .env values are loaded
+        _PIN_MEMORY = os.getenv("S3_PIN_MEMORY", "").lower() in ("1", "true", "yes") and torch.cuda.is_available()
+    if _PIN_MEMORY:
+        return image.pin_memory(), mask.pin_memory()
+    return image, mask
+
+
+def _decode_fast(binary_data: bytes) -> tuple[torch.Tensor, torch.Tensor] | None:
+    """Decode still JPEG/PNG bytes with torchvision's libjpeg-turbo/libpng
+    bindings, or return None to fall back to the PIL path."""
+    if decode_image is None:
+        return None
+    is_jpeg = binary_data[:3] == b"\xff\xd8\xff"
+    # Animated PNG needs the PIL multi-frame path; the acTL chunk must
+    # precede the first IDAT, so scan the whole header up to it
+    is_still_png = False
+    if binary_data[:8] == b"\x89PNG\r\n\x1a\n":
+        idat = binary_data.find(b"IDAT")
+        header = binary_data[:idat] if idat != -1 else binary_data
+        is_still_png = b"acTL" not in header
+    if not (is_jpeg or is_still_png):
+        return None
+    try:
+        encoded = torch.frombuffer(bytearray(binary_data), dtype=torch.uint8)
+        decoded = decode_image(encoded, mode=ImageReadMode.UNCHANGED, apply_exif_orientation=True)
+    except Exception as e:
+        logger.warning(f"Fast image decode failed, falling back to PIL: {e}")
+        return None
+    if decoded.dtype != torch.uint8:
+        # 16-bit PNGs decode to uint16; let the PIL "I"-mode branch rescale them
+        return None
+    channels = decoded.shape[0]
+    if channels not in (1, 3, 4):
+        return None
+    if channels == 4:
+        mask = decoded[3].to(torch.float32).mul_(-1.0 / 255.0).add_(1.0)
+        rgb = decoded[:3]
+    else:
+        mask = torch.zeros((64, 64), dtype=torch.float32, device="cpu")
+        rgb = decoded.expand(3, -1, -1) if channels == 1 else decoded
+    image = rgb.to(torch.float32).mul_(1.0 / 255.0).permute(1, 2, 0).contiguous()
+    return image.unsqueeze(0), mask.unsqueeze(0)
 
 
 class LoadImageS3:
     @classmethod
     def INPUT_TYPES(s):
-        input_dir = S3_INSTANCE.input_dir
+        input_dir = get_s3_instance().input_dir
         try:
-            files = S3_INSTANCE.get_files(prefix=input_dir)
+            files = get_s3_instance().get_files(prefix=input_dir)
         except Exception:
             files = []
         return {
@@ -23,7 +84,8 @@ class LoadImageS3:
                 "image": ("STRING", {"default": "", "image_upload": False}),
             },
             "optional": {
-                "image_list": (sorted(files), {"image_upload": False}),
+                # S3 already returns keys in lexicographic order, no extra sort needed
+                "image_list": (files, {"image_upload": False}),
                 "local_store": ("BOOLEAN", {"default": False}),
             },
         }
@@ -39,48 +101,75 @@ class LoadImageS3:
             err = "Failed to get S3 path"
             logger.error(err)
             raise Exception(err)
-        img = None
+        buffer = BytesIO()
+        if not get_s3_instance().download_to_fileobj(s3_path=s3_path, fileobj=buffer):
+            err = "Failed to download binary object from S3"
+            logger.error(err)
+            raise Exception(err)
         if local_store:
-            image_path = S3_INSTANCE.download_file(s3_path=s3_path, local_path=f"{self.LOCAL_FOLDER}{image}")
-            if not image_path:
-                err = "Failed to download object from S3"
-                logger.error(err)
-                raise Exception(err)
+            local_path = f"{self.LOCAL_FOLDER}{os.path.basename(s3_path)}"
+            local_dir = os.path.dirname(local_path)
+            if local_dir:
+                os.makedirs(local_dir, exist_ok=True)
+            with open(local_path, "wb") as local_file:
+                local_file.write(buffer.getvalue())
+        decoded = _decode_fast(buffer.getvalue())
+        if decoded is not None:
+            return _maybe_pin(*decoded)
 
-            img = Image.open(image_path)
-        else:
-            binary_data = S3_INSTANCE.download_object(s3_path=s3_path)
-            if binary_data is None:
-                err = "Failed to download binary object from S3"
-                logger.error(err)
-                raise Exception(err)
-            with BytesIO(binary_data) as binary_stream:
-                img = Image.open(binary_stream)
-                img.load()
-            del binary_data
-
-        output_images = []
-        output_masks = []
-        for i in ImageSequence.Iterator(img):
-            i = ImageOps.exif_transpose(i)
+        buffer.seek(0)
+        img = Image.open(buffer)
+        img.load()
+
+        def process_frame(i: Image.Image) -> tuple[torch.Tensor, torch.Tensor]:
+            # exif_transpose copies the whole frame, so skip it for the
+            # default orientation
+            orientation = i.getexif().get(0x0112, 1)
+            if orientation != 1:
+                i = ImageOps.exif_transpose(i)
             if i.mode == "I":
-                i = i.point(lambda i: i * (1 / 255))
-            image = i.convert("RGB")
-            image = np.array(image).astype(np.float32) / 255.0
-            image = torch.from_numpy(image)[None,]
+                i = i.point(_I_TO_L_TABLE, "L")
+            image = i if i.mode == "RGB" else i.convert("RGB")
+            raw = torch.frombuffer(bytearray(image.tobytes()), dtype=torch.uint8)
+            raw = raw.view(image.height, image.width, 3)
+            image = raw.to(torch.float32).mul_(1.0 / 255.0).unsqueeze(0)
             if "A" in i.getbands():
-                mask = np.array(i.getchannel("A")).astype(np.float32) / 255.0
-                mask = 1.0 - torch.from_numpy(mask)
+                alpha = i.getchannel("A")
+                mask = torch.frombuffer(bytearray(alpha.tobytes()), dtype=torch.uint8)
+                mask = mask.view(alpha.height, alpha.width)
+                # 1 - x/255 as in-place multiply-add, no extra float32 buffer
+                mask = mask.to(torch.float32).mul_(-1.0 / 255.0).add_(1.0)
             else:
                 mask = torch.zeros((64, 64), dtype=torch.float32, device="cpu")
-            output_images.append(image)
-            output_masks.append(mask.unsqueeze(0))
+            return image, mask.unsqueeze(0)
+
+        frames = [frame.copy() for frame in ImageSequence.Iterator(img)]
+        if len(frames) > 1:
+            # PIL and NumPy release the GIL, so frames decode in parallel.
+            with ThreadPoolExecutor(max_workers=min(8, len(frames))) as executor:
+                results = list(executor.map(process_frame, frames))
+        else:
+            results = [process_frame(frames[0])]
+        # Drop the decoded PIL frames before concatenating to keep peak RSS down
+        del img, buffer
+        frames.clear()
+        output_images = [image for image, _ in results]
+        output_masks = [mask for _, mask in results]
+        results.clear()
 
         if len(output_images) > 1:
-            output_image = torch.cat(output_images, dim=0)
-            output_mask = torch.cat(output_masks, dim=0)
+            output_image = torch.empty(
+                (len(output_images), *output_images[0].shape[1:]), dtype=torch.float32
+            )
+            torch.cat(output_images, dim=0, out=output_image)
+            output_images.clear()
+            output_mask = torch.empty(
+                (len(output_masks), *output_masks[0].shape[1:]), dtype=torch.float32
+            )
+            torch.cat(output_masks, dim=0, out=output_mask)
+            output_masks.clear()
         else:
             output_image = output_images[0]
             output_mask = output_masks[0]
 
-        return output_image, output_mask
+        return _maybe_pin(output_image, output_mask)
@@ -9,14 +9,12 @@ from comfy.cli_args import args
 
 from ..client_s3 import get_s3_instance
 
-S3_INSTANCE = get_s3_instance()
-
 
 class SaveImageS3:
     def __init__(self):
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
         self.temp_dir = os.path.join(base_dir, "temp/")
-        self.s3_output_dir = S3_INSTANCE.output_dir
+        self.s3_output_dir = get_s3_instance().output_dir
         self.type = "output"
         self.prefix_append = ""
         self.compress_level = 4
@@ -39,7 +37,7 @@ class SaveImageS3:
 
     def save_images(self, images, filename_prefix="ComfyUI", prompt=None, extra_pnginfo=None):
         filename_prefix += self.prefix_append
-        full_output_folder, filename, counter, subfolder, filename_prefix = S3_INSTANCE.get_save_path(filename_prefix, images[0].shape[1], images[0].shape[0])
+        full_output_folder, filename, counter, subfolder, filename_prefix = get_s3_instance().get_save_path(filename_prefix, images[0].shape[1], images[0].shape[0])
         results = list()
         s3_image_paths = list()
         
@@ -67,7 +65,7 @@ class SaveImageS3:
 
                     # Upload the temporary file to S3
                     s3_path = os.path.join(full_output_folder, file)
-                    file_path = S3_INSTANCE.upload_file(temp_file_path, s3_path)
+                    file_path = get_s3_instance().upload_file(temp_file_path, s3_path)
 
                     # Add the s3 path to the s3_image_paths list
                     s3_image_paths.append(file_path)
@@ -2,12 +2,10 @@ import os
 
 from ..client_s3 import get_s3_instance
 
-S3_INSTANCE = get_s3_instance()
-
 
 class SaveVideoFilesS3:
     def __init__(self):
-        self.s3_output_dir = S3_INSTANCE.output_dir
+        self.s3_output_dir = get_s3_instance().output_dir
         self.prefix_append = ""
 
     @classmethod
@@ -29,7 +27,7 @@ class SaveVideoFilesS3:
     def save_video_files(self, filenames, filename_prefix: str = "VideoFiles", move_file: bool = True):
         filename_prefix += self.prefix_append
         local_files = filenames[1]
-        full_output_folder, filename, counter, _, filename_prefix = S3_INSTANCE.get_save_path(filename_prefix)
+        full_output_folder, filename, counter, _, filename_prefix = get_s3_instance().get_save_path(filename_prefix)
         s3_video_paths = list()
 
         for path in local_files:
@@ -39,7 +37,7 @@ class SaveVideoFilesS3:
             # Upload the local file to S3
             s3_path = os.path.join(full_output_folder, file)
 
-            file_path = S3_INSTANCE.upload_file(path, s3_path, move_file=move_file)
+            file_path = get_s3_instance().upload_file(path, s3_path, move_file=move_file)
 
             # Add the s3 path to the s3_image_paths list
             s3_video_paths.append(file_path)
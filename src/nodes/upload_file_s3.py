@@ -2,8 +2,6 @@ import os
 
 from ..client_s3 import get_s3_instance
 
-S3_INSTANCE = get_s3_instance()
-
 
 class UploadFileS3:
     @classmethod
@@ -31,7 +29,7 @@ class UploadFileS3:
         for path in local_path:
             f_name = s3_filename if s3_filename else os.path.basename(path)
             s3_path = os.path.join(s3_folder, f_name)
-            file_path = S3_INSTANCE.upload_file(path, s3_path)
+            file_path = get_s3_instance().upload_file(path, s3_path)
             s3_paths.append(file_path)
             if delete_local == "true":
                 os.remove(path)